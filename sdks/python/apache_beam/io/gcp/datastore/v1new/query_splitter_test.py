@@ -58,8 +58,31 @@ class QuerySplitterTest(QuerySplitterTestBase):
   split_error = SplitNotPossibleError
   query_splitter = query_splitter
 
+  @classmethod
+  def setUpClass(cls):
+    super(QuerySplitterTest, cls).setUpClass()
+    # Key fixtures shared by the client_key_sort_key tests.
+    cls._k = key.Key('kind1', 1, project=cls._PROJECT,
+                     namespace=cls._NAMESPACE)
+    cls._k2 = key.Key('kind2', 'a', parent=cls._k)
+    cls._k3 = key.Key('kind2', 'b', parent=cls._k)
+    cls._k4 = key.Key('kind1', 'a', project=cls._PROJECT,
+                      namespace=cls._NAMESPACE)
+    cls._k5 = key.Key('kind1', 'a', project=cls._PROJECT)
+    cls._id1 = key.Key('kind', 1, project=cls._PROJECT)
+    cls._id2 = key.Key('kind', 2, project=cls._PROJECT)
+    cls._name1 = key.Key('kind', '1', project=cls._PROJECT)
+    cls._name2 = key.Key('kind', '2', project=cls._PROJECT)
+
   def setUp(self):
-    """Overrides base class version with skipIf() decorators."""
+    """Overrides base class version with skipIf() decorators.
+
+    Also patches types.Query._to_client_query for every test in this class;
+    check_get_splits sets its return_value to the mocked client query.
+    """
+    patcher = mock.patch.object(types.Query, '_to_client_query')
+    self._to_client_query_mock = patcher.start()
+    self.addCleanup(patcher.stop)
 
   def create_query(self, kinds=(), order=False, limit=None, offset=None,
                    inequality_filter=False):
@@ -118,13 +141,11 @@ class QuerySplitterTest(QuerySplitterTestBase):
         client_entities = helper.create_client_entities(num_entities,
                                                         id_or_name)
 
-      mock_client = mock.MagicMock()
-      mock_client_query = mock.MagicMock()
+      mock_client = mock.Mock()
+      mock_client_query = mock.Mock(spec=['fetch'])
       mock_client_query.fetch.return_value = client_entities
-      with mock.patch.object(
-          types.Query, '_to_client_query', return_value=mock_client_query):
-        split_queries = query_splitter.get_splits(
-            mock_client, query, num_splits)
+      self._to_client_query_mock.return_value = mock_client_query
+      split_queries = query_splitter.get_splits(mock_client, query, num_splits)
 
       mock_client_query.fetch.assert_called_once()
       # if request num_splits is greater than num_entities, the best it can
@@ -139,8 +160,8 @@ class QuerySplitterTest(QuerySplitterTestBase):
       # queryN: (__key__ >=keyN-1)
       prev_client_key = None
       last_query_seen = False
+      no_results = False
       for split_query in split_queries:
-        self.assertFalse(last_query_seen)
         lt_key = None
         gte_key = None
         for _filter in split_query.filters:
@@ -153,6 +174,7 @@ class QuerySplitterTest(QuerySplitterTestBase):
         # Case where the scatter query has no results.
         if lt_key is None and gte_key is None:
           self.assertEqual(1, len(split_queries))
+          no_results = True
           break
 
         if prev_client_key is None:
@@ -163,7 +185,12 @@ class QuerySplitterTest(QuerySplitterTestBase):
           self.assertEqual(prev_client_key, gte_key)
           prev_client_key = lt_key
           if lt_key is None:
+            # The split without an upper bound must be the last one.
+            self.assertIs(split_queries[-1], split_query)
             last_query_seen = True
+            break
+
+      self.assertTrue(last_query_seen or no_results)
 
   def test_id_or_name(self):
     id_ = query_splitter.IdOrName(1)
@@ -179,38 +206,28 @@ class QuerySplitterTest(QuerySplitterTestBase):
     self.assertLess(query_splitter.IdOrName('1'), query_splitter.IdOrName('2'))
 
   def test_client_key_sort_key(self):
-    k = key.Key('kind1', 1, project=self._PROJECT, namespace=self._NAMESPACE)
-    k2 = key.Key('kind2', 'a', parent=k)
-    k3 = key.Key('kind2', 'b', parent=k)
-    k4 = key.Key('kind1', 'a', project=self._PROJECT, namespace=self._NAMESPACE)
-    k5 = key.Key('kind1', 'a', project=self._PROJECT)
+    k, k2, k3, k4, k5 = self._k, self._k2, self._k3, self._k4, self._k5
     keys = [k5, k, k4, k3, k2, k2, k]
     expected_sort = [k5, k, k, k2, k2, k3, k4]
     keys.sort(key=query_splitter.client_key_sort_key)
     self.assertEqual(expected_sort, keys)
 
   def test_client_key_sort_key_ids(self):
-    k1 = key.Key('kind', 2, project=self._PROJECT)
-    k2 = key.Key('kind', 1, project=self._PROJECT)
-    keys = [k1, k2]
-    expected_sort = [k2, k1]
+    keys = [self._id2, self._id1]
+    expected_sort = [self._id1, self._id2]
     keys.sort(key=query_splitter.client_key_sort_key)
     self.assertEqual(expected_sort, keys)
 
   def test_client_key_sort_key_names(self):
-    k1 = key.Key('kind', '2', project=self._PROJECT)
-    k2 = key.Key('kind', '1', project=self._PROJECT)
-    keys = [k1, k2]
-    expected_sort = [k2, k1]
+    keys = [self._name2, self._name1]
+    expected_sort = [self._name1, self._name2]
     keys.sort(key=query_splitter.client_key_sort_key)
     self.assertEqual(expected_sort, keys)
 
   def test_client_key_sort_key_ids_vs_names(self):
     # Keys with IDs always come before keys with names.
-    k1 = key.Key('kind', '1', project=self._PROJECT)
-    k2 = key.Key('kind', 2, project=self._PROJECT)
-    keys = [k1, k2]
-    expected_sort = [k2, k1]
+    keys = [self._name1, self._id2]
+    expected_sort = [self._id2, self._name1]
     keys.sort(key=query_splitter.client_key_sort_key)
     self.assertEqual(expected_sort, keys)
 